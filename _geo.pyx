@@ -0,0 +1,69 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Compiled loss-of-separation pair check.
+
+Optional accelerator for flight_analysis.detect_loss_of_separation(); when
+the extension is not built the Numba kernel find_conflicts() is used instead.
+
+Build in place with: python setup.py build_ext --inplace
+"""
+
+from cython.parallel cimport prange
+from libc.math cimport asin, cos, fabs, sin, sqrt, M_PI
+from libc.stdint cimport int64_t
+
+cdef double DEG2RAD = M_PI / 180.0
+
+
+cdef inline double hav(double lat1, double lon1, double lat2, double lon2) noexcept nogil:
+    """Great-circle distance in nautical miles (same formula as flight_analysis)."""
+    cdef double R = 6371.0
+    cdef double phi1 = lat1 * DEG2RAD
+    cdef double phi2 = lat2 * DEG2RAD
+    cdef double s_phi = sin((lat2 - lat1) * DEG2RAD / 2)
+    cdef double s_lambda = sin((lon2 - lon1) * DEG2RAD / 2)
+    cdef double a = s_phi * s_phi + cos(phi1) * cos(phi2) * s_lambda * s_lambda
+    return R * 2 * asin(sqrt(a)) / 1.852
+
+
+def pairs_within(const double[::1] lats, const double[::1] lons, const double[::1] cos_lats,
+                 const double[::1] alts, const int64_t[::1] cand_i, const int64_t[::1] cand_j,
+                 double horiz_nm, double vert_ft, double[::1] out_d):
+    """
+    Checks candidate aircraft pairs for loss of separation, splitting the
+    candidates across cores (OpenMP) with the GIL released.
+
+    Same screening as flight_analysis.find_conflicts(): vertical filter,
+    bounding box, equirectangular estimate, then the exact haversine.
+
+    Args:
+        lats, lons, cos_lats, alts: Per-aircraft position, cos(latitude) and altitude
+        cand_i, cand_j: Candidate pair indices into the per-aircraft arrays
+        horiz_nm, vert_ft: Separation minima
+        out_d: Output, horizontal distance in nautical miles per candidate,
+            or -1.0 where the pair is separated
+    """
+    cdef Py_ssize_t k, m = cand_i.shape[0]
+    cdef int64_t i, j
+    cdef double dy, dx, d
+    cdef double approx_limit = horiz_nm * 1.02
+    cdef double box_deg = approx_limit / 60.0
+
+    with nogil:
+        for k in prange(m, schedule='static'):
+            out_d[k] = -1.0
+            i = cand_i[k]
+            j = cand_j[k]
+            if fabs(alts[i] - alts[j]) >= vert_ft:
+                continue
+            dy = lats[j] - lats[i]
+            if fabs(dy) > box_deg:
+                continue
+            dx = (lons[j] - lons[i]) * cos_lats[i]
+            if fabs(dx) > box_deg:
+                continue
+            if 60.0 * sqrt(dy * dy + dx * dx) >= approx_limit:
+                continue
+            d = hav(lats[i], lons[i], lats[j], lons[j])
+            if d < horiz_nm:
+                out_d[k] = d
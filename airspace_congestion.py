@@ -5,12 +5,17 @@ Detects airspace congestion hotspots by analyzing flight trajectories
 across 1°×1° grid sectors and 15-minute time windows.
 """
 
+import logging
 import math
-from collections import defaultdict
-from dataclasses import dataclass
-from typing import List, Tuple, Dict, Set
+from functools import lru_cache
+from typing import List, Tuple, Dict, Optional
 from datetime import datetime, timezone
 
+import numpy as np
+
+from geo_utils import njit, parse_route
+from parallel import map_flights
+
 # Import Flight from flight_loader if available
 try:
     from flight_loader import Flight
@@ -31,71 +36,56 @@ except ImportError:
         is_cargo: bool
 
 
-@dataclass
-class PositionSample:
-    """Represents a single position sample along a flight trajectory."""
-    timestamp: int  # Unix timestamp (UTC)
-    latitude: float
-    longitude: float
-    acid: str  # Flight callsign
+def _empty_trajectory(acid: str) -> Dict:
+    """Returns a trajectory with no samples, in the same layout as estimate_trajectory()."""
+    return {
+        'timestamp': np.empty(0, dtype=np.int64),
+        'lat': np.empty(0, dtype=np.float64),
+        'lon': np.empty(0, dtype=np.float64),
+        'acid': acid
+    }
 
 
-def parse_route(route_str: str) -> List[Tuple[float, float]]:
+def haversine_vector(lats1: np.ndarray, lons1: np.ndarray,
+                     lats2: np.ndarray, lons2: np.ndarray) -> np.ndarray:
     """
-    Converts a route string into a list of (latitude, longitude) tuples.
+    Calculates great-circle distances between arrays of points in nautical miles.
     
-    Route format: space-separated waypoints like "49.97N/110.935W 50.12N/111.2W"
+    All inputs are broadcast together, so a whole route (or every pair of
+    aircraft at a time step) is handled in a single vectorized call.
     
     Args:
-        route_str: Space-separated waypoints in format "latN/lonW" or "latS/lonE"
+        lats1, lons1: First point coordinates (degrees)
+        lats2, lons2: Second point coordinates (degrees)
         
     Returns:
-        List of (latitude, longitude) tuples as floats.
-        North/South: N = positive, S = negative
-        East/West: E = positive, W = negative
+        Array of distances in nautical miles
     """
-    if not route_str or not route_str.strip():
-        return []
+    # Earth radius in nautical miles
+    R = 3440.065  # nautical miles
     
-    waypoints = []
-    parts = route_str.strip().split()
+    # Convert to radians
+    lats1 = np.deg2rad(lats1)
+    lons1 = np.deg2rad(lons1)
+    lats2 = np.deg2rad(lats2)
+    lons2 = np.deg2rad(lons2)
     
-    for part in parts:
-        if '/' not in part:
-            continue
-            
-        try:
-            lat_str, lon_str = part.split('/', 1)
-            
-            # Parse latitude
-            lat_val = float(lat_str[:-1])  # Remove N/S/E/W
-            if lat_str[-1].upper() == 'S':
-                lat_val = -lat_val
-            elif lat_str[-1].upper() != 'N':
-                # If no direction specified, assume N
-                pass
-            
-            # Parse longitude
-            lon_val = float(lon_str[:-1])  # Remove N/S/E/W
-            if lon_str[-1].upper() == 'W':
-                lon_val = -lon_val
-            elif lon_str[-1].upper() != 'E':
-                # If no direction specified, assume E
-                pass
-            
-            waypoints.append((lat_val, lon_val))
-            
-        except (ValueError, IndexError) as e:
-            # Skip malformed waypoints
-            continue
+    # Haversine formula
+    dlat = lats2 - lats1
+    dlon = lons2 - lons1
+    
+    a = (np.sin(dlat / 2) ** 2 +
+         np.cos(lats1) * np.cos(lats2) * np.sin(dlon / 2) ** 2)
     
-    return waypoints
+    return 2 * R * np.arcsin(np.sqrt(a))
 
 
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Calculates great-circle distance between two points in nautical miles.
     
+    Thin scalar wrapper around haversine_vector().
+    
     Args:
         lat1, lon1: First point coordinates (degrees)
         lat2, lon2: Second point coordinates (degrees)
@@ -103,96 +93,138 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     Returns:
         Distance in nautical miles
     """
-    # Earth radius in nautical miles
-    R = 3440.065  # nautical miles
-    
-    # Convert to radians
-    lat1_rad = math.radians(lat1)
-    lon1_rad = math.radians(lon1)
-    lat2_rad = math.radians(lat2)
-    lon2_rad = math.radians(lon2)
-    
-    # Haversine formula
-    dlat = lat2_rad - lat1_rad
-    dlon = lon2_rad - lon1_rad
+    return float(haversine_vector(lat1, lon1, lat2, lon2))
+
+
+@njit(cache=True)
+def gen_segment(lat1: float, lon1: float, lat2: float, lon2: float, t0: int, dt: float,
+                out_lat: np.ndarray, out_lon: np.ndarray, out_t: np.ndarray) -> int:
+    """
+    Samples one straight segment once per piece that stays inside a single
+    1°×1° sector and 15-minute window.
     
-    a = (math.sin(dlat / 2) ** 2 + 
-         math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2)
-    c = 2 * math.asin(math.sqrt(a))
+    Piece boundaries (where the path crosses a whole degree of latitude or
+    longitude, or the clock crosses a window boundary) are computed
+    analytically, and each sample is placed at the middle of its piece.
     
-    return R * c
+    Args:
+        lat1, lon1: Segment start (degrees)
+        lat2, lon2: Segment end (degrees)
+        t0: Unix timestamp at the segment start
+        dt: Time to fly the segment (seconds)
+        out_lat, out_lon, out_t: Preallocated output slices, large enough
+            for every piece (see estimate_trajectory())
+        
+    Returns:
+        Number of samples written
+    """
+    fractions = np.empty(out_lat.shape[0] + 1)
+    fractions[0] = 0.0
+    fractions[1] = 1.0
+    k = 2
+    
+    # Whole-degree latitude/longitude lines strictly inside the segment
+    if lat2 != lat1:
+        for g in range(math.floor(min(lat1, lat2)) + 1, math.ceil(max(lat1, lat2))):
+            fractions[k] = (g - lat1) / (lat2 - lat1)
+            k += 1
+    if lon2 != lon1:
+        for g in range(math.floor(min(lon1, lon2)) + 1, math.ceil(max(lon1, lon2))):
+            fractions[k] = (g - lon1) / (lon2 - lon1)
+            k += 1
+    
+    # 15-minute window boundaries passed while flying the segment
+    w = (t0 // 900 + 1) * 900
+    while w < t0 + dt:
+        fractions[k] = (w - t0) / dt
+        k += 1
+        w += 900
+    
+    fractions = np.sort(fractions[:k])
+    n = 0
+    for j in range(k - 1):
+        if fractions[j + 1] <= fractions[j]:
+            continue
+        f = 0.5 * (fractions[j] + fractions[j + 1])
+        out_lat[n] = lat1 + f * (lat2 - lat1)
+        out_lon[n] = lon1 + f * (lon2 - lon1)
+        out_t[n] = t0 + np.int64(f * dt)
+        n += 1
+    return n
 
 
-def estimate_trajectory(flight: Flight) -> List[PositionSample]:
+def estimate_trajectory(flight: Flight) -> Dict:
     """
     Reconstructs approximate aircraft positions over time using straight-line
     motion between waypoints.
     
-    Samples the trajectory every 1-2 minutes based on aircraft speed.
+    Rather than sampling at a fixed rate, each segment gets exactly one
+    sample per piece it spends in a single 1°×1° sector and 15-minute window
+    (see gen_segment()), so every (sector, window) the flight touches is
+    registered with as few samples as possible. The samples are stored as
+    parallel NumPy arrays (one entry per sample).
     
     Args:
         flight: Flight object with route, departure_time, and aircraft_speed
         
     Returns:
-        List of PositionSample objects representing the flight path over time
+        Dictionary describing the flight path over time:
+        {
+            'timestamp': int64 array of Unix timestamps (UTC),
+            'lat': float64 array of latitudes,
+            'lon': float64 array of longitudes,
+            'acid': str
+        }
     """
-    waypoints = parse_route(flight.route)
+    wp = parse_route(flight.route)
     
-    if len(waypoints) < 2:
+    if len(wp) < 2:
         # Need at least 2 waypoints to form a segment
-        return []
+        return _empty_trajectory(flight.acid)
     
-    samples = []
-    current_time = flight.departure_time
     speed_knots = flight.aircraft_speed
     
     if speed_knots <= 0:
         # Invalid speed, skip this flight
-        return []
+        return _empty_trajectory(flight.acid)
     
-    # Sample interval: 1.5 minutes (90 seconds) for good coverage
-    sample_interval = 90  # seconds
+    # Distances (nautical miles) of every segment in one vectorized call
+    segment_distances = haversine_vector(wp[:-1, 0], wp[:-1, 1], wp[1:, 0], wp[1:, 1])
     
-    # Process each segment between consecutive waypoints
-    for i in range(len(waypoints) - 1):
-        lat1, lon1 = waypoints[i]
-        lat2, lon2 = waypoints[i + 1]
-        
-        # Calculate distance in nautical miles
-        distance_nm = haversine_distance(lat1, lon1, lat2, lon2)
-        
-        # Calculate time to traverse this segment (in seconds)
-        # Speed is in knots (nautical miles per hour)
-        time_for_segment = (distance_nm / speed_knots) * 3600  # seconds
-        
-        if time_for_segment <= 0:
-            continue
-        
-        # Sample along this segment
-        num_samples = max(1, int(time_for_segment / sample_interval))
-        
-        for j in range(num_samples + 1):  # +1 to include endpoint
-            t = j / num_samples if num_samples > 0 else 0
-            t = min(t, 1.0)  # Clamp to [0, 1]
-            
-            # Linear interpolation between waypoints
-            lat = lat1 + t * (lat2 - lat1)
-            lon = lon1 + t * (lon2 - lon1)
-            
-            # Calculate timestamp for this sample
-            sample_time = current_time + int(t * time_for_segment)
-            
-            samples.append(PositionSample(
-                timestamp=sample_time,
-                latitude=lat,
-                longitude=lon,
-                acid=flight.acid
-            ))
-        
-        # Update current time for next segment
-        current_time += int(time_for_segment)
+    # Time to traverse each segment (in seconds); speed is in knots (nautical miles per hour)
+    segment_times = (segment_distances / speed_knots) * 3600
+    start_times = flight.departure_time + np.concatenate(([0], np.cumsum(segment_times.astype(np.int64))[:-1]))
+    
+    # Upper bound on pieces per segment: one more than the sector and window
+    # boundaries crossed. Zero-length segments contribute no samples.
+    sector_crossings = (np.abs(np.floor(wp[1:, 0]) - np.floor(wp[:-1, 0])) +
+                        np.abs(np.floor(wp[1:, 1]) - np.floor(wp[:-1, 1])))
+    window_crossings = (start_times + segment_times) // 900 - start_times // 900
+    moving = segment_times > 0
+    capacity = np.where(moving, sector_crossings + window_crossings + 1, 0).astype(np.int64)
+    
+    total = int(capacity.sum())
+    if total == 0:
+        return _empty_trajectory(flight.acid)
     
-    return samples
+    lats = np.empty(total, dtype=np.float64)
+    lons = np.empty(total, dtype=np.float64)
+    timestamps = np.empty(total, dtype=np.int64)
+    
+    # Process each segment between consecutive waypoints
+    n = 0
+    for i in np.flatnonzero(moving).tolist():
+        end = n + capacity[i]
+        n += gen_segment(wp[i, 0], wp[i, 1], wp[i + 1, 0], wp[i + 1, 1],
+                         start_times[i], segment_times[i],
+                         lats[n:end], lons[n:end], timestamps[n:end])
+    
+    return {
+        'timestamp': timestamps[:n],
+        'lat': lats[:n],
+        'lon': lons[:n],
+        'acid': flight.acid
+    }
 
 
 def get_sector(lat: float, lon: float) -> Tuple[int, int]:
@@ -224,7 +256,7 @@ def get_time_window(timestamp: int) -> int:
     return (timestamp // 900) * 900
 
 
-def detect_congestion(flights: List[Flight]) -> List[Dict]:
+def detect_congestion(flights: List[Flight], processes: Optional[int] = 1) -> List[Dict]:
     """
     Detects airspace congestion hotspots.
     
@@ -233,6 +265,8 @@ def detect_congestion(flights: List[Flight]) -> List[Dict]:
     
     Args:
         flights: List of Flight objects
+        processes: Worker processes for trajectory generation
+            (default: 1, serially in this process; None uses one per CPU)
         
     Returns:
         List of dictionaries containing hotspot information:
@@ -244,34 +278,67 @@ def detect_congestion(flights: List[Flight]) -> List[Dict]:
             'flights': Set[str]
         }
     """
-    # Track unique flights per (sector, time_window)
-    # Structure: {(sector_lat, sector_lon, window_start): Set[acid]}
-    sector_window_flights: Dict[Tuple[int, int, int], Set[str]] = defaultdict(set)
+    # Gather every trajectory sample into flat arrays, tagging each sample
+    # with a small integer id for its flight callsign
+    acid_ids: Dict[str, int] = {}
+    lats, lons, timestamps, ids = [], [], [], []
+    for trajectory in map_flights(estimate_trajectory, flights, processes):
+        n = len(trajectory['timestamp'])
+        if n == 0:
+            continue
+        lats.append(trajectory['lat'])
+        lons.append(trajectory['lon'])
+        timestamps.append(trajectory['timestamp'])
+        ids.append(np.full(n, acid_ids.setdefault(trajectory['acid'], len(acid_ids)), dtype=np.int64))
     
-    # Process all flights
-    for flight in flights:
-        samples = estimate_trajectory(flight)
-        
-        for sample in samples:
-            sector_lat, sector_lon = get_sector(sample.latitude, sample.longitude)
-            window_start = get_time_window(sample.timestamp)
-            
-            key = (sector_lat, sector_lon, window_start)
-            sector_window_flights[key].add(flight.acid)
+    if not timestamps:
+        return []
+    
+    lats = np.concatenate(lats)
+    lons = np.concatenate(lons)
+    timestamps = np.concatenate(timestamps)
+    ids = np.concatenate(ids)
+    
+    # Coordinates off the globe would spill out of their bits in the packed key below
+    on_globe = (np.abs(lats) <= 90) & (np.abs(lons) <= 180)
+    if not on_globe.all():
+        logging.warning(f"Skipping {np.count_nonzero(~on_globe)} trajectory samples with coordinates out of range")
+        lats, lons, timestamps, ids = lats[on_globe], lons[on_globe], timestamps[on_globe], ids[on_globe]
+        if len(timestamps) == 0:
+            return []
+    
+    # Sector and 15-minute window of every sample, packed into one int64 key:
+    # bits 55-62 hold sector_lat + 90, bits 46-54 sector_lon + 180, bits 0-45 window number.
+    # Windows are numbered densely over the ones that occur, so any timestamp range fits
+    sector_lats = np.floor(lats).astype(np.int64)
+    sector_lons = np.floor(lons).astype(np.int64)
+    window_indexes, window_number = np.unique(timestamps // 900, return_inverse=True)
+    keys = ((sector_lats + 90) << 55) | ((sector_lons + 180) << 46) | window_number
+    
+    # Number the occupied (sector, window) buckets densely, then pack
+    # (bucket, flight) into one int64 so a plain 1-D unique drops repeat samples
+    bucket_keys, bucket_idx = np.unique(keys, return_inverse=True)
+    num_ids = len(acid_ids)
+    unique_pairs = np.unique(bucket_idx * num_ids + ids)
+    pair_buckets = unique_pairs // num_ids
+    pair_ids = unique_pairs % num_ids
+    
+    # Unique flights per bucket; each bucket's flights are contiguous in unique_pairs
+    counts = np.bincount(pair_buckets, minlength=len(bucket_keys))
+    starts = np.cumsum(counts) - counts
     
     # Find hotspots (more than 5 unique flights)
+    acids = list(acid_ids)
     hotspots = []
-    for (sector_lat, sector_lon, window_start), flight_set in sector_window_flights.items():
-        flight_count = len(flight_set)
-        
-        if flight_count > 5:
-            hotspots.append({
-                'sector_lat': sector_lat,
-                'sector_lon': sector_lon,
-                'window_start': window_start,
-                'flight_count': flight_count,
-                'flights': flight_set
-            })
+    hot = counts > 5
+    for key, start, flight_count in zip(bucket_keys[hot].tolist(), starts[hot].tolist(), counts[hot].tolist()):
+        hotspots.append({
+            'sector_lat': (key >> 55) - 90,
+            'sector_lon': ((key >> 46) & 0x1FF) - 180,
+            'window_start': int(window_indexes[key & 0x3FFFFFFFFFFF]) * 900,
+            'flight_count': flight_count,
+            'flights': {acids[i] for i in pair_ids[start:start + flight_count].tolist()}
+        })
     
     # Sort by time, then by sector
     hotspots.sort(key=lambda x: (x['window_start'], x['sector_lat'], x['sector_lon']))
@@ -279,29 +346,38 @@ def detect_congestion(flights: List[Flight]) -> List[Dict]:
     return hotspots
 
 
+@lru_cache(maxsize=4096)
+def _sector_strings(sector_lat: int, sector_lon: int) -> Tuple[str, str]:
+    """Formats a sector's latitude and longitude bounds (cached per sector)."""
+    lat_bound = f"{sector_lat}–{sector_lat + 1}N" if sector_lat >= 0 else f"{abs(sector_lat + 1)}–{abs(sector_lat)}S"
+    lon_bound = f"{abs(sector_lon)}–{abs(sector_lon + 1)}W" if sector_lon < 0 else f"{sector_lon}–{sector_lon + 1}E"
+    return lat_bound, lon_bound
+
+
+@lru_cache(maxsize=4096)
+def _win_strings(window_start: int) -> str:
+    """Formats a 15-minute window as "HH:MM–HH:MM UTC" (cached per window start)."""
+    start_dt = datetime.fromtimestamp(window_start, tz=timezone.utc)
+    end_dt = datetime.fromtimestamp(window_start + 900, tz=timezone.utc)
+    return f"{start_dt.strftime('%H:%M')}–{end_dt.strftime('%H:%M')} UTC"
+
+
 def format_hotspot_output(hotspot: Dict) -> str:
     """
     Formats a hotspot dictionary into a human-readable string.
     
+    Sector bounds and time windows are formatted once and cached, since
+    hotspots sorted by time often share them.
+    
     Args:
         hotspot: Hotspot dictionary from detect_congestion()
         
     Returns:
         Formatted string for display
     """
-    sector_lat = hotspot['sector_lat']
-    sector_lon = hotspot['sector_lon']
-    window_start = hotspot['window_start']
     flight_count = hotspot['flight_count']
-    
-    # Format sector bounds
-    lat_bound = f"{sector_lat}–{sector_lat + 1}N" if sector_lat >= 0 else f"{abs(sector_lat + 1)}–{abs(sector_lat)}S"
-    lon_bound = f"{abs(sector_lon)}–{abs(sector_lon + 1)}W" if sector_lon < 0 else f"{sector_lon}–{sector_lon + 1}E"
-    
-    # Format time window
-    start_dt = datetime.fromtimestamp(window_start, tz=timezone.utc)
-    end_dt = datetime.fromtimestamp(window_start + 900, tz=timezone.utc)
-    time_str = f"{start_dt.strftime('%H:%M')}–{end_dt.strftime('%H:%M')} UTC"
+    lat_bound, lon_bound = _sector_strings(hotspot['sector_lat'], hotspot['sector_lon'])
+    time_str = _win_strings(hotspot['window_start'])
     
     # Determine risk level
     if flight_count > 10:
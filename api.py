@@ -4,7 +4,7 @@ from typing import List, Optional
 import json
 
 from flight_loader import Flight, load_flights
-from flight_analysis import detect_loss_of_separation, validate_flight
+from flight_analysis import detect_loss_of_separation, validate_flight, validate_flights as validate_flight_table
 from congestion_analysis import detect_congestion
 from airspace_congestion import detect_congestion as detect_airspace_congestion, suggest_prioritization
 
@@ -180,11 +180,12 @@ def validate_flights(file: str):
     """
     try:
         flights = load_flights(file)
+        altitude_ok, speed_ok = validate_flight_table(flights)
         all_issues = []
-        for flight in flights:
-            issues = validate_flight(flight)
-            if issues:
-                all_issues.extend(issues)
+        # Build issue messages only for the flights that failed a check
+        for i, ok in enumerate((altitude_ok & speed_ok).tolist()):
+            if not ok:
+                all_issues.extend(validate_flight(flights[i]))
         return {
             "total_flights": len(flights),
             "flights_with_issues": len(set(issue["flight"] for issue in all_issues)),
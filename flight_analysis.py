@@ -1,7 +1,36 @@
+import logging
 import math
 import datetime
 from typing import List, Tuple, Optional, Dict, Any
-from flight_loader import Flight, load_flights
+
+import numpy as np
+
+try:
+    import cupy as cp
+    if not cp.cuda.is_available():
+        # CuPy is installed but there is no usable CUDA device
+        cp = None
+except ImportError:
+    # GPU pair sweep is optional (needs CUDA)
+    cp = None
+
+# Failures on the GPU that fall back to the CPU pair check
+_GPU_ERRORS = () if cp is None else (
+    cp.cuda.runtime.CUDARuntimeError,
+    cp.cuda.driver.CUDADriverError,
+    cp.cuda.memory.OutOfMemoryError,
+    cp.cuda.compiler.CompileException,
+)
+
+try:
+    import _geo
+except ImportError:
+    # Compiled pair check not built (see setup.py)
+    _geo = None
+
+from flight_loader import Flight, FlightTable, load_flights
+from geo_utils import cos_lat, njit, parse_route, prange
+from parallel import map_flights
 
 # Reference Data: Canadian Airports (ICAO Codes)
 AIRPORT_LOCATIONS = {
@@ -54,88 +83,285 @@ def get_aircraft_category(plane_type: str) -> str:
             return category
     return "Unknown"
 
+# Lookup tables for the altitude/speed checks, indexed by plane type id.
+# The extra last slot (id -1) holds open bounds for unknown types, which pass both checks.
+_PLANE_TYPES = list(dict.fromkeys(
+    [t for types in AIRCRAFT_CATEGORIES.values() for t in types] +
+    # Speed rules keyed by a name match a plane type of that exact name too
+    list(SPEED_CONSTRAINTS)
+))
+_PTYPE_TO_ID = {t: i for i, t in enumerate(_PLANE_TYPES)}
+_ALT_RANGE_BY_TYPE = [ALTITUDE_RANGES.get(get_aircraft_category(t)) for t in _PLANE_TYPES]
+_SPD_RANGE_BY_TYPE = [SPEED_CONSTRAINTS.get(t) or SPEED_CONSTRAINTS.get(get_aircraft_category(t)) for t in _PLANE_TYPES]
+_MIN_ALT = np.array([r[0] if r else -np.inf for r in _ALT_RANGE_BY_TYPE] + [-np.inf])
+_MAX_ALT = np.array([r[1] if r else np.inf for r in _ALT_RANGE_BY_TYPE] + [np.inf])
+_MIN_SPD = np.array([r[0] if r else -np.inf for r in _SPD_RANGE_BY_TYPE] + [-np.inf])
+_MAX_SPD = np.array([r[1] if r else np.inf for r in _SPD_RANGE_BY_TYPE] + [np.inf])
+
+def validate_flights(flights: List[Flight]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Checks the altitude and speed constraints of a whole fleet in one pass.
+    Accepts a list of Flight objects or a FlightTable.
+    Flights without a plane type fail both checks, as validate_flight() reports them.
+    Returns: (altitude_ok, speed_ok) boolean arrays with one entry per flight.
+    """
+    table = FlightTable.from_flights(flights)
+    has_type = np.not_equal(table.plane_type, None)
+    
+    # Map each distinct plane type to its id once, then broadcast back to the rows
+    unique_types, inverse = np.unique(table.plane_type.astype(str), return_inverse=True)
+    type_ids = np.array([_PTYPE_TO_ID.get(t, -1) for t in unique_types.tolist()], dtype=np.int64)[inverse]
+    
+    altitude_ok = has_type & (_MIN_ALT[type_ids] <= table.altitude) & (table.altitude <= _MAX_ALT[type_ids])
+    speed_ok = has_type & (_MIN_SPD[type_ids] <= table.aircraft_speed) & (table.aircraft_speed <= _MAX_SPD[type_ids])
+    return altitude_ok, speed_ok
+
 def validate_flight(flight: Flight) -> List[Dict[str, Any]]:
-    """Checks if a flight adheres to operational constraints (Altitude & Speed)."""
+    """
+    Checks if a flight adheres to operational constraints (Altitude & Speed).
+    Single-flight counterpart of validate_flights(), using the same lookup tables.
+    """
     issues = []
     
     if flight.plane_type is None:
         issues.append({"flight": flight.acid, "issue": "Missing plane type"})
         return issues 
 
-    category = get_aircraft_category(flight.plane_type)
+    type_id = _PTYPE_TO_ID.get(flight.plane_type, -1)
     
     # Check Altitude
-    if flight.altitude is not None and category in ALTITUDE_RANGES:
+    if flight.altitude is not None and not (_MIN_ALT[type_id] <= flight.altitude <= _MAX_ALT[type_id]):
+        category = get_aircraft_category(flight.plane_type)
         min_alt, max_alt = ALTITUDE_RANGES[category]
-        if not (min_alt <= flight.altitude <= max_alt):
-            issues.append({
-                "flight": flight.acid,
-                "issue": f"Altitude {flight.altitude} ft out of allowed range ({min_alt}-{max_alt}) for {category} aircraft"
-            })
+        issues.append({
+            "flight": flight.acid,
+            "issue": f"Altitude {flight.altitude} ft out of allowed range ({min_alt}-{max_alt}) for {category} aircraft"
+        })
             
     # Check Speed
-    if flight.aircraft_speed is not None:
-        speed_range = None
-        if flight.plane_type in SPEED_CONSTRAINTS:
-            speed_range = SPEED_CONSTRAINTS[flight.plane_type]
-        elif category in SPEED_CONSTRAINTS:
-            speed_range = SPEED_CONSTRAINTS[category]
-            
-        if speed_range:
-            min_spd, max_spd = speed_range
-            if not (min_spd <= flight.aircraft_speed <= max_spd):
-                issues.append({
-                    "flight": flight.acid,
-                    "issue": f"Speed {flight.aircraft_speed} knots out of allowed range ({min_spd}-{max_spd}) for {flight.plane_type}"
-                })
+    if flight.aircraft_speed is not None and not (_MIN_SPD[type_id] <= flight.aircraft_speed <= _MAX_SPD[type_id]):
+        min_spd, max_spd = _SPD_RANGE_BY_TYPE[type_id]
+        issues.append({
+            "flight": flight.acid,
+            "issue": f"Speed {flight.aircraft_speed} knots out of allowed range ({min_spd}-{max_spd}) for {flight.plane_type}"
+        })
             
     return issues
 
-def parse_route(route_str: Optional[str]) -> List[Tuple[float, float]]:
-    """Parses a route string into a list of (latitude, longitude) tuples."""
-    coordinates = []
-    if not route_str:
-        return coordinates
-
-    parts = route_str.strip().split()
-    for part in parts:
-        try:
-            if '/' not in part: continue
-            lat_str, lon_str = part.split('/')
-            def parse_coord(c_str):
-                val = float(c_str[:-1])
-                return -val if c_str[-1].upper() in ('S', 'W') else val
-            coordinates.append((parse_coord(lat_str), parse_coord(lon_str)))
-        except (ValueError, IndexError):
-            continue
-    return coordinates
-
 def get_full_flight_path(flight: Flight) -> List[Tuple[float, float]]:
     """Constructs path including Departure, Route Waypoints, Arrival."""
     path = []
     if flight.departure_airport and flight.departure_airport in AIRPORT_LOCATIONS:
         path.append(AIRPORT_LOCATIONS[flight.departure_airport])
-    path.extend(parse_route(flight.route))
+    path.extend(tuple(wp) for wp in parse_route(flight.route).tolist())
     if flight.arrival_airport and flight.arrival_airport in AIRPORT_LOCATIONS:
         path.append(AIRPORT_LOCATIONS[flight.arrival_airport])
     return path
 
-def haversine_distance_km(coord1: Tuple[float, float], coord2: Tuple[float, float]) -> float:
-    """Calculates great-circle distance in kilometers."""
+def haversine_distance_km(coord1: Tuple[Any, Any], coord2: Tuple[Any, Any]) -> Any:
+    """
+    Calculates great-circle distance in kilometers.
+    Each coordinate may hold scalars or NumPy arrays of latitudes/longitudes,
+    so whole routes or all aircraft pairs are measured in one vectorized call.
+    """
     lat1, lon1 = coord1
     lat2, lon2 = coord2
     R = 6371.0 
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    delta_phi = np.radians(np.subtract(lat2, lat1))
+    delta_lambda = np.radians(np.subtract(lon2, lon1))
+    a = np.sin(delta_phi / 2)**2 + np.cos(phi1) * np.cos(phi2) * np.sin(delta_lambda / 2)**2
+    # asin form: one sqrt and one trig call fewer than atan2(sqrt(a), sqrt(1 - a)).
+    # It only loses accuracy near antipodal points, far beyond any distance checked here.
+    c = 2 * np.arcsin(np.sqrt(a))
+    return R * c
+
+def horizontal_distance_nm(coord1: Tuple[Any, Any], coord2: Tuple[Any, Any]) -> Any:
+    """Calculates distance in nautical miles (scalar or vectorized)."""
+    km = haversine_distance_km(coord1, coord2)
+    return km / 1.852
+
+@njit(fastmath=True, cache=True)
+def _pair_distance_nm(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Scalar haversine_distance_km() in nautical miles, for use inside JIT kernels."""
+    R = 6371.0
     phi1, phi2 = math.radians(lat1), math.radians(lat2)
     delta_phi = math.radians(lat2 - lat1)
     delta_lambda = math.radians(lon2 - lon1)
     a = math.sin(delta_phi / 2)**2 + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return R * c
+    c = 2 * math.asin(math.sqrt(a))
+    return R * c / 1.852
 
-def horizontal_distance_nm(coord1: Tuple[float, float], coord2: Tuple[float, float]) -> float:
-    """Calculates distance in nautical miles."""
-    km = haversine_distance_km(coord1, coord2)
-    return km / 1.852
+# Neighbouring sectors visited from each occupied sector. Together with
+# the i < j check inside a sector, this half-stencil covers the 8 neighbours
+# while visiting every pair of sectors only once.
+_FORWARD_NEIGHBOURS = ((0, 1), (1, -1), (1, 0), (1, 1))
+
+# Sector key = (lat + 90) * _CELL_STRIDE + (lon + 180); the stride leaves a gap
+# past lon + 180 = 360, so a neighbour offset never lands in another latitude row
+_CELL_STRIDE = 1024
+# Key offsets of the own sector followed by the forward neighbours
+_STENCIL_OFFSETS = np.array([0] + [dlat * _CELL_STRIDE + dlon for dlat, dlon in _FORWARD_NEIGHBOURS], dtype=np.int64)
+
+@njit(cache=True)
+def candidate_pairs(lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Buckets aircraft into 1°×1° sectors and returns the index pairs (i < j) that
+    share a sector or sit in adjacent ones, ordered by i then j.
+    One degree is at least 5 nm for the latitudes flown here, so pairs further
+    apart can never lose horizontal separation.
+    Aircraft are sorted by sector key, so each stencil sector is a contiguous
+    run found with a binary search; pairs are counted, then written in one pass.
+    """
+    n = lats.shape[0]
+    cells = np.empty(n, dtype=np.int64)
+    for k in range(n):
+        cells[k] = (math.floor(lats[k]) + 90) * _CELL_STRIDE + (math.floor(lons[k]) + 180)
+    order = np.argsort(cells, kind='mergesort')
+    sorted_cells = cells[order]
+
+    # Run of sorted positions [lo, hi) in each stencil sector, for every aircraft
+    m = _STENCIL_OFFSETS.shape[0]
+    lo = np.empty((m, n), dtype=np.int64)
+    hi = np.empty((m, n), dtype=np.int64)
+    total = 0
+    for r in range(n):
+        cell = sorted_cells[r]
+        # Own sector: only the aircraft after this one in the run, so each pair appears once
+        lo[0, r] = r + 1
+        hi[0, r] = np.searchsorted(sorted_cells, cell, side='right')
+        for s in range(1, m):
+            query = cell + _STENCIL_OFFSETS[s]
+            lo[s, r] = np.searchsorted(sorted_cells, query, side='left')
+            hi[s, r] = np.searchsorted(sorted_cells, query, side='right')
+        for s in range(m):
+            total += hi[s, r] - lo[s, r]
+
+    # Order by i then j through one packed key
+    keys = np.empty(total, dtype=np.int64)
+    p = 0
+    for r in range(n):
+        i = order[r]
+        for s in range(m):
+            for q in range(lo[s, r], hi[s, r]):
+                j = order[q]
+                keys[p] = min(i, j) * n + max(i, j)
+                p += 1
+    keys.sort()
+    return keys // n, keys % n
+
+@njit(parallel=True, fastmath=True, cache=True)
+def find_conflicts(lats: np.ndarray, lons: np.ndarray, cos_lats: np.ndarray, alts: np.ndarray, cand_i: np.ndarray, cand_j: np.ndarray, horiz_nm: float, vert_ft: float) -> np.ndarray:
+    """
+    Checks candidate aircraft pairs for loss of separation (closer than horiz_nm
+    horizontally and vert_ft vertically), splitting the candidates across cores.
+    A bounding-box test on the latitude and scaled longitude offsets (1° = 60 nm)
+    rejects most pairs with single compares; a trig-free equirectangular estimate
+    (longitude scaled by cos_lats, e.g. from the geo_utils.cos_lat() table)
+    rejects the rest of the separated pairs, so only pairs within 2% of the
+    limit pay for the exact haversine that ends up in the report.
+    Returns: horizontal distance in nautical miles per candidate, or -1.0 where the pair is separated.
+    """
+    m = cand_i.shape[0]
+    out_d = np.full(m, -1.0)
+    approx_limit = horiz_nm * 1.02
+    box_deg = approx_limit / 60.0
+    for k in prange(m):
+        i = cand_i[k]
+        j = cand_j[k]
+        if abs(alts[i] - alts[j]) >= vert_ft:
+            continue
+        dy = lats[j] - lats[i]
+        if abs(dy) > box_deg:
+            continue
+        dx = (lons[j] - lons[i]) * cos_lats[i]
+        if abs(dx) > box_deg:
+            continue
+        if 60.0 * math.sqrt(dy * dy + dx * dx) >= approx_limit:
+            continue
+        d = _pair_distance_nm(lats[i], lons[i], lats[j], lons[j])
+        if d < horiz_nm:
+            out_d[k] = d
+    return out_d
+
+# Aircraft airborne in the same minute above which the GPU all-pairs sweep
+# outruns sector bucketing on the CPU
+GPU_MIN_AIRCRAFT = 5000
+
+# One thread per pair (i < j): the flat pair index k is decoded into its row i
+# and column j, so only the upper triangle is launched. Screening runs in FP32
+# with a 2% margin; survivors get their exact distance on the host.
+_PAIRS_WITHIN_SRC = r"""
+extern "C" __global__
+void pairs_within(const float* lat, const float* lon, const float* alt,
+                  const long long n, const float limit_nm, const float vert_ft,
+                  int* out_i, int* out_j, unsigned long long* count,
+                  const unsigned long long capacity)
+{
+    long long k = (long long)blockIdx.x * blockDim.x + threadIdx.x;
+    if (k >= n * (n - 1) / 2) return;
+    int i = (int)(n - 2 - (long long)floor(sqrt(-8.0 * k + 4.0 * n * (n - 1) - 7) / 2.0 - 0.5));
+    int j = (int)(k + i + 1 - n * (n - 1) / 2 + (n - i) * (n - i - 1) / 2);
+
+    if (fabsf(alt[i] - alt[j]) >= vert_ft) return;
+    const float d2r = 0.017453292519943295f;
+    float s_phi = sinf((lat[j] - lat[i]) * d2r * 0.5f);
+    float s_lambda = sinf((lon[j] - lon[i]) * d2r * 0.5f);
+    float a = s_phi * s_phi + cosf(lat[i] * d2r) * cosf(lat[j] * d2r) * s_lambda * s_lambda;
+    if (2.0f * 3440.065f * asinf(sqrtf(a)) >= limit_nm) return;
+
+    unsigned long long slot = atomicAdd(count, 1ULL);
+    if (slot < capacity) {
+        out_i[slot] = i;
+        out_j[slot] = j;
+    }
+}
+"""
+_pairs_within_kernel = None
+
+def find_conflicts_gpu(lats: np.ndarray, lons: np.ndarray, alts: np.ndarray, horiz_nm: float, vert_ft: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Checks every aircraft pair (i < j) for loss of separation on the GPU (requires CuPy).
+    Returns: (pair_i, pair_j, distances_nm) for the conflicting pairs, ordered by i then j.
+    """
+    global _pairs_within_kernel
+    if _pairs_within_kernel is None:
+        _pairs_within_kernel = cp.RawKernel(_PAIRS_WITHIN_SRC, "pairs_within")
+
+    n = len(lats)
+    total = n * (n - 1) // 2
+    lat_d = cp.asarray(lats, dtype=cp.float32)
+    lon_d = cp.asarray(lons, dtype=cp.float32)
+    alt_d = cp.asarray(alts, dtype=cp.float32)
+    count = cp.zeros(1, dtype=cp.uint64)
+    capacity = 4 * n
+    threads = 256
+    blocks = (total + threads - 1) // threads
+
+    while True:
+        out_i = cp.empty(capacity, dtype=cp.int32)
+        out_j = cp.empty(capacity, dtype=cp.int32)
+        count.fill(0)
+        _pairs_within_kernel(
+            (blocks,), (threads,),
+            (lat_d, lon_d, alt_d, np.int64(n), np.float32(horiz_nm * 1.02), np.float32(vert_ft),
+             out_i, out_j, count, np.uint64(capacity))
+        )
+        found = int(cp.asnumpy(count)[0])
+        if found <= capacity:
+            break
+        # Output buffer overflowed: rerun with room for every hit
+        capacity = found
+
+    pair_i = cp.asnumpy(out_i[:found]).astype(np.int64)
+    pair_j = cp.asnumpy(out_j[:found]).astype(np.int64)
+    order = np.lexsort((pair_j, pair_i))
+    pair_i, pair_j = pair_i[order], pair_j[order]
+
+    # Exact FP64 distances for the screened pairs
+    dists = horizontal_distance_nm((lats[pair_i], lons[pair_i]), (lats[pair_j], lons[pair_j]))
+    close = dists < horiz_nm
+    return pair_i[close], pair_j[close], dists[close]
 
 def interpolate_position(start: Tuple[float, float], end: Tuple[float, float], fraction: float) -> Tuple[float, float]:
     """Linear interpolation between two lat/lon points."""
@@ -159,12 +385,15 @@ def generate_4d_trajectory(flight: Flight, path: List[Tuple[float, float]], time
     # Start point
     if not path: return {}
     
+    # Segment lengths for the whole path in one vectorized call
+    points = np.array(path, dtype=float)
+    segment_dists = horizontal_distance_nm((points[:-1, 0], points[:-1, 1]), (points[1:, 0], points[1:, 1]))
+    
     # We simulate segment by segment
-    for i in range(len(path) - 1):
+    for i, dist_nm in enumerate(segment_dists.tolist()):
         p1 = path[i]
         p2 = path[i+1]
         
-        dist_nm = horizontal_distance_nm(p1, p2)
         if dist_nm == 0: continue
         
         duration_sec = dist_nm / speed_nm_per_sec
@@ -189,87 +418,148 @@ def generate_4d_trajectory(flight: Flight, path: List[Tuple[float, float]], time
         
     return trajectory
 
-def detect_loss_of_separation(flights: List[Flight]) -> List[Dict[str, Any]]:
+def _trajectory_worker(flight: Flight) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Builds one flight's 4D trajectory as parallel (minutes, lats, lons) arrays,
+    which pickle far more cheaply than the dict when returned from a worker process.
+    Returns None if the flight has no usable trajectory.
+    """
+    path = get_full_flight_path(flight)
+    if not path: return None
+    
+    traj = generate_4d_trajectory(flight, path)
+    if not traj: return None
+    
+    positions = np.array(list(traj.values()), dtype=np.float64)
+    minutes = np.fromiter(traj.keys(), dtype=np.int64, count=len(traj))
+    return minutes, positions[:, 0], positions[:, 1]
+
+# Dense per-minute slots are used while there are at most this many per
+# trajectory sample; wider time ranges (outlier timestamps) fall back to np.unique
+_DENSE_SLOTS_PER_SAMPLE = 4
+
+@njit(cache=True)
+def _order_by_slot(slots: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Counting sort: returns the sample order that groups samples by slot, given
+    each slot's start in offsets. Stable, so each minute keeps the flights in row order.
+    """
+    order = np.empty(slots.shape[0], dtype=np.int64)
+    fill = offsets[:-1].copy()
+    for k in range(slots.shape[0]):
+        order[fill[slots[k]]] = k
+        fill[slots[k]] += 1
+    return order
+
+def detect_loss_of_separation(flights: List[Flight], processes: Optional[int] = 1) -> List[Dict[str, Any]]:
     """
     Detects separation conflicts using 4D trajectory simulation.
     Checks if aircraft are at the same location at the same time.
+    Accepts a list of Flight objects or a FlightTable.
+    Trajectories are generated in `processes` worker processes
+    (default: 1, serially in this process; None uses one per CPU).
     """
     conflicts = []
+    table = FlightTable.from_flights(flights)
+    
+    # A repeated ACID (e.g. the same flight in two loaded files) is one aircraft:
+    # as with a dict keyed by ACID, the last row wins but keeps the first row's place
+    acids = table.acid.astype(str)
+    _, first_rows = np.unique(acids, return_index=True)
+    _, last_from_end = np.unique(acids[::-1], return_index=True)
+    if len(first_rows) < len(table):
+        table = table[(len(table) - 1 - last_from_end)[np.argsort(first_rows)]]
     
     # 1. Preprocessing: Validate and Generate Trajectories
-    flight_trajectories = {} # ACID -> Dict[timestamp, (lat, lon)]
-    flight_objects = {}      # ACID -> Flight object
+    print(f"Generating 4D trajectories for {len(table)} flights (this may take a moment)...")
+    trajectories = map_flights(_trajectory_worker, table, processes)
     
-    print(f"Generating 4D trajectories for {len(flights)} flights (this may take a moment)...")
-    for f in flights:
-        flight_objects[f.acid] = f
-        path = get_full_flight_path(f)
-        if not path: continue
-        
-        traj = generate_4d_trajectory(f, path)
-        if traj:
-            flight_trajectories[f.acid] = traj
+    # Row index -> (minutes, lats, lons)
+    flight_trajectories = {idx: traj for idx, traj in enumerate(trajectories) if traj is not None}
 
     # 2. Check for Conflicts
-    sorted_flights = sorted(flights, key=lambda x: x.departure_time if x.departure_time else 0)
-    print(f"Checking for conflicts among {len(sorted_flights)} flights (4D simulation)...")
+    print(f"Checking for conflicts among {len(table)} flights (4D simulation)...")
     
     HORIZ_SEP_NM = 5.0
     VERT_SEP_FT = 2000
     
-    # Optimize: Invert the trajectory map to Time -> List[(ACID, Pos)]
+    # Optimize: Invert the trajectory map to Time -> positions, held as one flat
+    # array per field grouped by minute. Minutes are dense slots (t - t_min) // 60,
+    # so each minute's positions are a contiguous slice found by offset, not a dict lookup
     # This allows us to only check flights active at the same minute
-    position_by_time = {}
-    for acid, traj in flight_trajectories.items():
-        for t, pos in traj.items():
-            if t not in position_by_time:
-                position_by_time[t] = []
-            position_by_time[t].append((acid, pos))
-            
-    # Iterate through time steps (minutes)
-    sorted_times = sorted(position_by_time.keys())
+    if not flight_trajectories:
+        return conflicts
+    all_idx = np.concatenate([np.full(len(traj[0]), idx, dtype=np.int64) for idx, traj in flight_trajectories.items()])
+    all_minutes, all_lats, all_lons = (np.concatenate(column) for column in zip(*flight_trajectories.values()))
+    
+    t_min = int(all_minutes.min())
+    span = (int(all_minutes.max()) - t_min) // 60 + 1
+    if span <= _DENSE_SLOTS_PER_SAMPLE * len(all_minutes):
+        minutes = t_min + 60 * np.arange(span, dtype=np.int64)
+        slots = (all_minutes - t_min) // 60
+        counts = np.bincount(slots, minlength=span)
+    else:
+        # Outlier timestamps stretch the range: slot only the minutes that occur
+        minutes, slots, counts = np.unique(all_minutes, return_inverse=True, return_counts=True)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    order = _order_by_slot(slots, offsets)
+    all_idx, all_lats, all_lons = all_idx[order], all_lats[order], all_lons[order]
     
     # To avoid duplicate reports for the same conflict (e.g. minute 1, 2, 3), we track active conflicts
     active_conflicts = set() # (acid1, acid2)
+    # Cleared if the GPU fails, so later busy minutes go straight to the CPU
+    use_gpu = cp is not None
     
-    for t in sorted_times:
-        aircraft_at_t = position_by_time[t]
+    # Iterate through time steps (minutes) in order; minutes with fewer than 2 aircraft are skipped
+    for slot in np.flatnonzero(counts >= 2).tolist():
+        t = int(minutes[slot])
+        start, end = offsets[slot], offsets[slot + 1]
+        n = end - start
+        
+        # Contiguous float64 buffers for the pair checks
+        idx_array = all_idx[start:end]
+        lats = all_lats[start:end]
+        lons = all_lons[start:end]
+        alts = table.altitude[idx_array].astype(np.float64)
         
-        # Compare all pairs at this minute
-        for i in range(len(aircraft_at_t)):
-            acid1, pos1 = aircraft_at_t[i]
-            flight1 = flight_objects[acid1]
+        pairs = None
+        if use_gpu and n >= GPU_MIN_AIRCRAFT:
+            # Very busy minute: brute-force every pair on the GPU
+            try:
+                pairs = find_conflicts_gpu(lats, lons, alts, HORIZ_SEP_NM, float(VERT_SEP_FT))
+            except _GPU_ERRORS as e:
+                logging.warning(f"GPU pair check failed ({e}), continuing on the CPU")
+                use_gpu = False
+        if pairs is None:
+            # Only pairs in the same or adjacent sectors can conflict; the compiled
+            # extension (or the JIT kernel) runs the vertical and horizontal checks on those
+            cand_i, cand_j = candidate_pairs(lats, lons)
+            cos_lats = cos_lat(lats)
+            if _geo is not None:
+                cand_dists = np.empty(len(cand_i))
+                _geo.pairs_within(lats, lons, cos_lats, alts, cand_i, cand_j, HORIZ_SEP_NM, float(VERT_SEP_FT), cand_dists)
+            else:
+                cand_dists = find_conflicts(lats, lons, cos_lats, alts, cand_i, cand_j, HORIZ_SEP_NM, float(VERT_SEP_FT))
+            hit = cand_dists >= 0
+            pairs = cand_i[hit], cand_j[hit], cand_dists[hit]
+        pair_i, pair_j, pair_dists = pairs
+        
+        for i, j, dist_nm in zip(idx_array[pair_i].tolist(), idx_array[pair_j].tolist(), pair_dists.tolist()):
+            acid1 = table.acid[i]
+            acid2 = table.acid[j]
             
-            for j in range(i + 1, len(aircraft_at_t)):
-                acid2, pos2 = aircraft_at_t[j]
-                flight2 = flight_objects[acid2]
-                
-                # Check Vertical
-                if flight1.altitude is not None and flight2.altitude is not None:
-                    if abs(flight1.altitude - flight2.altitude) >= VERT_SEP_FT:
-                        continue
-                
-                # Check Horizontal
-                dist_nm = horizontal_distance_nm(pos1, pos2)
-                
-                if dist_nm < HORIZ_SEP_NM:
-                    pair_key = tuple(sorted((acid1, acid2)))
-                    if pair_key not in active_conflicts:
-                        # New conflict detected
-                        conflicts.append({
-                            "flight1": acid1,
-                            "flight2": acid2,
-                            "horizontal_nm": round(dist_nm, 2),
-                            "vertical_ft": abs(flight1.altitude - flight2.altitude),
-                            "reason": "Loss-of-separation detected",
-                            "start_time_overlap": datetime.datetime.fromtimestamp(t, tz=datetime.timezone.utc).strftime("%Y-%m-%d %H:%M")
-                        })
-                        active_conflicts.add(pair_key)
-                else:
-                    # If they are separated now, remove from active set so we can report a new conflict later if they converge again?
-                    # Or keep it simple: report once per pair. 
-                    # Let's assume one report per pair is sufficient for "conflict detected".
-                    pass
+            pair_key = tuple(sorted((acid1, acid2)))
+            if pair_key not in active_conflicts:
+                # New conflict detected
+                conflicts.append({
+                    "flight1": acid1,
+                    "flight2": acid2,
+                    "horizontal_nm": round(dist_nm, 2),
+                    "vertical_ft": abs(int(table.altitude[i]) - int(table.altitude[j])),
+                    "reason": "Loss-of-separation detected",
+                    "start_time_overlap": datetime.datetime.fromtimestamp(t, tz=datetime.timezone.utc).strftime("%Y-%m-%d %H:%M")
+                })
+                active_conflicts.add(pair_key)
 
     return conflicts
 
@@ -2,11 +2,33 @@ import json
 import logging
 import os
 from dataclasses import dataclass
-from typing import List, Optional, Union
+from typing import Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    # Fallback: the standard library parser (slower on large files)
+    orjson = None
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
+# Per Flight field: accepted JSON keys (in priority order), default, cast, column dtype
+_FIELD_SPECS = {
+    "acid": (["ACID", "acid", "flight_id"], None, str, object),
+    "plane_type": (["Plane type", "plane_type", "aircraft"], "Unknown", str, object),
+    "route": (["route", "flight_path"], "", str, object),
+    "altitude": (["altitude", "alt", "level"], 0, int, np.int64),
+    "departure_airport": (["departure airport", "dep_airport", "origin"], "Unknown", str, object),
+    "arrival_airport": (["arrival airport", "arr_airport", "dest"], "Unknown", str, object),
+    "departure_time": (["departure time", "dep_time", "timestamp"], 0, int, np.int64),
+    "aircraft_speed": (["aircraft speed", "speed", "ground_speed"], 0.0, float, np.float64),
+    "passengers": (["passengers", "pax"], 0, int, np.int64),
+    "is_cargo": (["is_cargo", "cargo"], False, bool, bool),
+}
+
 @dataclass
 class Flight:
     """
@@ -42,52 +64,178 @@ class Flight:
 
         try:
             # Critical field: ACID
-            acid = get_val(["ACID", "acid", "flight_id"])
+            acid = get_val(_FIELD_SPECS["acid"][0])
             if not acid:
                 return None
             
             # Normalize other fields with defaults
-            return cls(
-                acid=str(acid),
-                plane_type=str(get_val(["Plane type", "plane_type", "aircraft"], "Unknown")),
-                route=str(get_val(["route", "flight_path"], "")),
-                altitude=int(get_val(["altitude", "alt", "level"], 0)),
-                departure_airport=str(get_val(["departure airport", "dep_airport", "origin"], "Unknown")),
-                arrival_airport=str(get_val(["arrival airport", "arr_airport", "dest"], "Unknown")),
-                departure_time=int(get_val(["departure time", "dep_time", "timestamp"], 0)),
-                aircraft_speed=float(get_val(["aircraft speed", "speed", "ground_speed"], 0.0)),
-                passengers=int(get_val(["passengers", "pax"], 0)),
-                is_cargo=bool(get_val(["is_cargo", "cargo"], False))
-            )
-        except (ValueError, TypeError) as e:
+            values = {
+                name: cast(get_val(keys, default))
+                for name, (keys, default, cast, _) in _FIELD_SPECS.items()
+            }
+            # Numbers must also fit their FlightTable column (raises OverflowError)
+            for name, (_, _, _, dtype) in _FIELD_SPECS.items():
+                if dtype is not object:
+                    np.asarray(values[name], dtype=dtype)
+            return cls(**values)
+        except (ValueError, TypeError, OverflowError) as e:
             logging.warning(f"Error parsing flight data for ACID {data.get('ACID', 'Unknown')}: {e}")
             return None
 
-def load_flights_from_file(filepath: str) -> List[Flight]:
+@dataclass(eq=False)
+class FlightTable:
+    """
+    Columnar (structure-of-arrays) store for a fleet of flights.
+    Each field is held in one NumPy array so bulk checks run as single
+    array operations. Indexing with an int returns a Flight view of that row;
+    indexing with a slice, mask or index array returns a sub-table.
+    """
+    acid: np.ndarray
+    plane_type: np.ndarray
+    route: np.ndarray
+    altitude: np.ndarray
+    departure_airport: np.ndarray
+    arrival_airport: np.ndarray
+    departure_time: np.ndarray
+    aircraft_speed: np.ndarray
+    passengers: np.ndarray
+    is_cargo: np.ndarray
+
+    def __post_init__(self):
+        self.acid = np.asarray(self.acid, dtype=object)
+        self.plane_type = np.asarray(self.plane_type, dtype=object)
+        self.route = np.asarray(self.route, dtype=object)
+        self.altitude = np.asarray(self.altitude, dtype=np.int64)
+        self.departure_airport = np.asarray(self.departure_airport, dtype=object)
+        self.arrival_airport = np.asarray(self.arrival_airport, dtype=object)
+        self.departure_time = np.asarray(self.departure_time, dtype=np.int64)
+        self.aircraft_speed = np.asarray(self.aircraft_speed, dtype=np.float64)
+        self.passengers = np.asarray(self.passengers, dtype=np.int64)
+        self.is_cargo = np.asarray(self.is_cargo, dtype=bool)
+
+    @classmethod
+    def from_flights(cls, flights: Iterable[Flight]) -> 'FlightTable':
+        """Builds a table from Flight objects (returns tables unchanged)."""
+        if isinstance(flights, cls):
+            return flights
+        flights = list(flights)
+        return cls(
+            acid=[f.acid for f in flights],
+            plane_type=[f.plane_type for f in flights],
+            route=[f.route for f in flights],
+            altitude=[f.altitude for f in flights],
+            departure_airport=[f.departure_airport for f in flights],
+            arrival_airport=[f.arrival_airport for f in flights],
+            departure_time=[f.departure_time for f in flights],
+            aircraft_speed=[f.aircraft_speed for f in flights],
+            passengers=[f.passengers for f in flights],
+            is_cargo=[f.is_cargo for f in flights]
+        )
+
+    @classmethod
+    def from_records(cls, records: list) -> 'FlightTable':
+        """
+        Builds a table straight from parsed JSON records, one column at a time,
+        without creating a Flight per record.
+        Records that are not dicts or have no ACID are skipped.
+        Raises ValueError/TypeError/OverflowError if any field cannot be converted.
+        """
+        rows = [r for r in records if isinstance(r, dict)]
+        rows = [r for r, acid in zip(rows, _column(rows, *_FIELD_SPECS["acid"][:2])) if acid]
+        n = len(rows)
+        return cls(**{
+            name: np.fromiter(map(cast, _column(rows, keys, default)), dtype=dtype, count=n)
+            for name, (keys, default, cast, dtype) in _FIELD_SPECS.items()
+        })
+
+    @classmethod
+    def concat(cls, tables: List['FlightTable']) -> 'FlightTable':
+        """Concatenates several tables into one."""
+        if not tables:
+            return cls.from_flights([])
+        return cls(**{
+            name: np.concatenate([getattr(t, name) for t in tables])
+            for name in cls.__dataclass_fields__
+        })
+
+    def __len__(self) -> int:
+        return len(self.acid)
+
+    def __getitem__(self, index) -> Union[Flight, 'FlightTable']:
+        if isinstance(index, (int, np.integer)):
+            return Flight(
+                acid=self.acid[index],
+                plane_type=self.plane_type[index],
+                route=self.route[index],
+                altitude=int(self.altitude[index]),
+                departure_airport=self.departure_airport[index],
+                arrival_airport=self.arrival_airport[index],
+                departure_time=int(self.departure_time[index]),
+                aircraft_speed=float(self.aircraft_speed[index]),
+                passengers=int(self.passengers[index]),
+                is_cargo=bool(self.is_cargo[index])
+            )
+        return FlightTable(**{
+            name: getattr(self, name)[index]
+            for name in self.__dataclass_fields__
+        })
+
+    def __iter__(self) -> Iterator[Flight]:
+        for row in zip(*(getattr(self, name).tolist() for name in self.__dataclass_fields__)):
+            yield Flight(*row)
+
+def _column(rows: List[dict], keys: List[str], default=None) -> list:
+    """
+    Collects one field from every record, taking the first key that is
+    present and not None (same rules as Flight.from_dict).
+    """
+    values = [row.get(keys[0]) for row in rows]
+    for key in keys[1:]:
+        if None not in values:
+            break
+        values = [row.get(key) if v is None else v for v, row in zip(values, rows)]
+    if None in values:
+        values = [default if v is None else v for v in values]
+    return values
+
+def _read_json(filepath: str):
     """
-    Loads flight data from a single JSON file.
+    Parses a JSON file, using orjson when it is installed.
+    orjson rejects some input json accepts (e.g. NaN/Infinity literals),
+    so those files are reparsed with json.
     """
-    flights = []
+    if orjson is not None:
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            return json.loads(raw)
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_flights_from_file(filepath: str) -> FlightTable:
+    """
+    Loads flight data from a single JSON file into a FlightTable.
+    """
+    flights = FlightTable.from_flights([])
     
     if not os.path.exists(filepath):
         logging.error(f"File not found: {filepath}")
-        return []
+        return FlightTable.from_flights([])
 
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _read_json(filepath)
             
         if not isinstance(data, list):
             logging.error(f"Expected a list of flights in {filepath}, but got {type(data).__name__}")
-            return []
-
-        for item in data:
-            flight = Flight.from_dict(item)
-            if flight:
-                flights.append(flight)
-            else:
-                # Optional: Log skipped items if strict debugging is needed
-                pass
+            return flights
+
+        try:
+            flights = FlightTable.from_records(data)
+        except (ValueError, TypeError, OverflowError):
+            # Some record has a bad field: parse row by row so only that record is dropped
+            flights = FlightTable.from_flights(f for f in map(Flight.from_dict, data) if f)
                 
         logging.info(f"Loaded {len(flights)} flights from {filepath}")
                 
@@ -98,7 +246,7 @@ def load_flights_from_file(filepath: str) -> List[Flight]:
         
     return flights
 
-def load_flights(filepaths: Union[str, List[str]]) -> List[Flight]:
+def load_flights(filepaths: Union[str, List[str]]) -> FlightTable:
     """
     Loads flight data from one or multiple JSON files and combines them.
     
@@ -106,18 +254,15 @@ def load_flights(filepaths: Union[str, List[str]]) -> List[Flight]:
         filepaths: A single file path string or a list of file path strings.
         
     Returns:
-        Combined list of Flight objects from all files.
+        Combined FlightTable from all files. Iterating or indexing it
+        yields Flight objects.
     """
-    all_flights = []
-    
     if isinstance(filepaths, str):
         filepaths = [filepaths]
         
-    for path in filepaths:
-        flights = load_flights_from_file(path)
-        all_flights.extend(flights)
+    tables = [load_flights_from_file(path) for path in filepaths]
         
-    return all_flights
+    return FlightTable.concat(tables)
 
 if __name__ == "__main__":
     import sys
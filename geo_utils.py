@@ -0,0 +1,78 @@
+"""
+Geographic Utilities Module
+
+Shared helpers for the analysis modules: route string parsing, a
+cos(latitude) lookup table and the optional Numba JIT decorators.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # Fallback for environments without Numba: kernels run as plain Python
+    prange = range
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# One whole waypoint token, e.g. "49.97N/110.935W" or ".5N/100W"
+_WAYPOINT_RE = re.compile(r"(-?(?:\d+(?:\.\d*)?|\.\d+))([NSns])/(-?(?:\d+(?:\.\d*)?|\.\d+))([EWew])")
+
+# cos(latitude) for every 0.1° from -90° to 90°. Snapping to the table is off by
+# at most tan(lat) * 0.00087 relative, well inside the margins of the screening
+# estimates that use it; exact distances keep using the real cos().
+_COS_LAT_LUT = np.cos(np.deg2rad(np.arange(-900, 901) / 10.0))
+
+# Parsed routes kept by parse_route(); identical routes are common across flights
+_ROUTE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=_ROUTE_CACHE_SIZE)
+def parse_route(route_str: str) -> np.ndarray:
+    """
+    Converts a route string into an array of (latitude, longitude) rows.
+
+    Route format: space-separated waypoints like "49.97N/110.935W 50.12N/111.2W"
+
+    Results are cached per route string (most recent _ROUTE_CACHE_SIZE) and
+    returned read-only, so callers must copy the array before modifying it.
+
+    Args:
+        route_str: Space-separated waypoints in format "latN/lonW" or "latS/lonE"
+
+    Returns:
+        Float array of shape (n, 2) holding latitude and longitude in degrees.
+        North/South: N = positive, S = negative
+        East/West: E = positive, W = negative
+        Malformed waypoints are skipped.
+    """
+    matches = (_WAYPOINT_RE.fullmatch(token) for token in (route_str or "").split())
+    waypoints = np.array(
+        [(-float(lat) if ns in 'Ss' else float(lat),
+          -float(lon) if ew in 'Ww' else float(lon))
+         for lat, ns, lon, ew in (m.groups() for m in matches if m)],
+        dtype=float
+    ).reshape(-1, 2)
+    waypoints.flags.writeable = False
+    return waypoints
+
+
+def cos_lat(lat_deg: Any) -> Any:
+    """
+    Looks up cos(latitude) from a 0.1° table instead of calling cos().
+
+    Args:
+        lat_deg: Latitude in degrees, scalar or NumPy array
+
+    Returns:
+        Approximate cosine of the latitude, with the same shape as the input.
+        Latitudes beyond ±90° (malformed waypoints) read the pole entry,
+        cos = 0, which only makes the screening estimates more conservative.
+    """
+    return _COS_LAT_LUT[np.clip(np.rint(np.multiply(lat_deg, 10)).astype(np.int64) + 900, 0, 1800)]
@@ -0,0 +1,79 @@
+"""
+Parallel Helpers Module
+
+Spreads per-flight work over a process pool that is created once and
+reused by every later call.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from typing import Any, Callable, Iterable, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+# Worker processes are started from a clean server process rather than forked
+# from the caller, which may already be running Numba's (fork-unsafe) thread pool
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Shared pool, started on first use; workers pay the numpy/Numba import once
+_POOL = None
+_POOL_PROCESSES = 0
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool(processes: int):
+    """Returns the shared pool, (re)starting it if the worker count changed."""
+    global _POOL, _POOL_PROCESSES
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_PROCESSES != processes:
+            if _POOL is not None:
+                _POOL.terminate()
+            _POOL = _MP_CONTEXT.Pool(processes)
+            _POOL_PROCESSES = processes
+        return _POOL
+
+
+@atexit.register
+def shutdown_pool() -> None:
+    """Stops the shared pool's workers (also run at interpreter exit)."""
+    global _POOL, _POOL_PROCESSES
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.terminate()
+            _POOL.join()
+        _POOL = None
+        _POOL_PROCESSES = 0
+
+
+def map_flights(func: Callable[[Any], T], flights: Iterable[Any], processes: Optional[int] = 1, chunksize: int = 64) -> List[T]:
+    """
+    Applies func to every flight, optionally spreading the work over a process pool.
+
+    Starting workers costs far more than the per-flight work on the bundled
+    data sets, so the default is serial. With processes > 1 the pool is kept
+    and reused across calls; the calling script must then be guarded by
+    `if __name__ == "__main__":`.
+
+    Args:
+        func: Module-level (picklable) function taking a Flight.
+        flights: Flights to process (list of Flight objects or a FlightTable).
+        processes: Number of worker processes (default: 1, serial in the
+            current process). None uses one per CPU.
+        chunksize: Number of flights handed to a worker at a time.
+
+    Returns:
+        Results in the same order as flights.
+    """
+    flights = list(flights)
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    # A single worker or a single chunk gains nothing from a pool
+    if processes <= 1 or len(flights) <= chunksize:
+        return [func(f) for f in flights]
+
+    return _get_pool(processes).map(func, flights, chunksize=chunksize)
@@ -0,0 +1,19 @@
+"""
+Builds the optional compiled separation check (_geo). Needs Cython 3:
+
+    pip install -r requirements-build.txt
+    python setup.py build_ext --inplace
+"""
+
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+setup(
+    name="conflict-zero-geo",
+    ext_modules=cythonize(
+        [Extension("_geo", ["_geo.pyx"],
+                   extra_compile_args=["-O3", "-ffast-math", "-march=native", "-fopenmp"],
+                   extra_link_args=["-fopenmp"])],
+        language_level=3,
+    ),
+)